@@ -1,13 +1,18 @@
+import functools
 import logging
 import os
+import shutil
 import signal
 from multiprocessing import Process
 from pathlib import Path
+from typing import BinaryIO
 
+import ctranslate2
 import magic
-import whisper
 from fastapi import APIRouter, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
+from faster_whisper import WhisperModel
 
 from audio_text_backend.schema import fileRequest, terminateRequest
 from audio_text_backend.utils import generate_random_name
@@ -17,6 +22,12 @@ logger = logging.getLogger(__name__)
 UPLOAD_DIR_PATH = Path("/tmp/uploads")
 TRANSCRIPTION_DIR_PATH = Path("/tmp/transcriptions")
 
+CHUNK_SIZE = 1024 * 1024
+
+# Preferred CUDA compute types, fastest first. float32 is supported on every
+# CUDA device; float16 and int8 depend on the compute capability.
+CUDA_COMPUTE_TYPES = ("float16", "int8_float32", "float32")
+
 router = APIRouter(
     prefix="/audio",
     tags=["audio"],
@@ -24,25 +35,44 @@ router = APIRouter(
 )
 
 
+@functools.cache
+def get_mime_detector() -> magic.Magic:
+    # python-magic guards calls with its own lock, so one shared instance is
+    # safe to use from the threadpool.
+    return magic.Magic(mime=True)
+
+
+def load_whisper_model(mode: str) -> WhisperModel:
+    if ctranslate2.get_cuda_device_count() > 0:
+        supported = ctranslate2.get_supported_compute_types("cuda")
+        compute_type = next(t for t in CUDA_COMPUTE_TYPES if t in supported)
+        return WhisperModel(mode, device="cuda", compute_type=compute_type)
+    return WhisperModel(mode, device="cpu", compute_type="int8")
+
+
 def run_trascription(file_path: Path, mode: str, transcription_filename: str) -> None:
-    model = whisper.load_model(mode)
-    result = model.transcribe(str(file_path))
-    text = result["text"]
+    model = load_whisper_model(mode)
+    segments, _ = model.transcribe(str(file_path), beam_size=5, without_timestamps=True)
+    text = "".join(segment.text for segment in segments)
     final_file_path = TRANSCRIPTION_DIR_PATH.joinpath(transcription_filename)
     final_file_path.parent.mkdir(parents=True, exist_ok=True)
     final_file_path.write_text(text)
 
 
+def save_upload(source: BinaryIO, file_path: Path) -> None:
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(source, f, CHUNK_SIZE)
+
+
 @router.post("/upload")
 async def upload(file: UploadFile):
     filename = file.filename
-    name, extension = filename.split(".")
-    new_filename = f"{generate_random_name(name)}.{extension}"
+    name, extension = os.path.splitext(filename)
+    new_filename = f"{generate_random_name(name)}{extension}"
     file_path = UPLOAD_DIR_PATH.joinpath(new_filename)
     logger.info("file %s is uploading into %s", filename, file_path)
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    file_data = await file.read()
-    file_path.write_bytes(file_data)
+    await run_in_threadpool(save_upload, file.file, file_path)
     return {"filename": new_filename}
 
 
@@ -51,7 +81,7 @@ async def transcribe(data: fileRequest):
     filename = data.filename
     file_path = UPLOAD_DIR_PATH.joinpath(filename)
     logger.info("Getting text from audio file %s located in %s", filename, file_path)
-    name, _ = filename.split(".")
+    name, _ = os.path.splitext(filename)
     transcription_filename = f"{name}.txt"
     process = Process(
         target=run_trascription, args=(file_path, data.mode, transcription_filename)
@@ -69,7 +99,7 @@ async def terminate_transcription(data: terminateRequest) -> None:
 
 
 @router.get("/transcription")
-async def get_transcription(filename: str):
+def get_transcription(filename: str):
     file_path = TRANSCRIPTION_DIR_PATH.joinpath(filename)
     text = None
     if file_path.exists():
@@ -78,13 +108,14 @@ async def get_transcription(filename: str):
 
 
 @router.get("/data")
-async def get_audio_data(filename: str) -> StreamingResponse:
+def get_audio_data(filename: str) -> StreamingResponse:
     file_path = UPLOAD_DIR_PATH.joinpath(filename)
-    content_type = magic.Magic(mime=True).from_file(file_path)
+    content_type = get_mime_detector().from_file(str(file_path))
     logger.info("Sending data of file %s wiht content type %s", file_path, content_type)
 
     def iterfile():
         with open(file_path, "rb") as f:
-            yield from f
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
 
     return StreamingResponse(iterfile(), media_type=content_type)
@@ -4,7 +4,9 @@ VERSION = "0.1"
 
 INSTALL_REQUIRES = [
     "fastapi[all]==0.92.0",
-    "openai-whisper==20231117",
+    "faster-whisper==1.0.3",
+    "ctranslate2==4.3.1",
+    "huggingface-hub==0.24.6",
     "setuptools-rust==1.9.0",
     "python-magic==0.4.27",
 ]
@@ -21,6 +23,10 @@ setup(
     entry_points={"console_scripts": []},
     install_requires=INSTALL_REQUIRES,
     extras_require={
+        "gpu": [
+            "nvidia-cublas-cu12==12.4.5.8",
+            "nvidia-cudnn-cu12==8.9.7.29",
+        ],
         "dev": [
             "bandit==1.7.0",
             "mypy==0.931",